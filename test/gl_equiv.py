@@ -0,0 +1,507 @@
+# Bit-parallel equivalence check of the gate level netlist against the reference model
+#
+# Parses gate_level_netlist.v, builds a levelized evaluation graph from
+# functional models of the sg13g2 standard cells it uses, and evaluates it
+# with one bit-packed Python integer per net, each bit being one test vector.
+# A batch covers the full 2^16 instruction space at once, every lane with a
+# random register file state, and is compared against the reference model:
+#
+#   - uo_out, uio_out and uio_oe
+#   - the next state of every register file flop (reset inactive)
+#
+# Run from the test directory after copying the netlist as for GATES=yes:
+#
+#   python gl_equiv.py                        check gate_level_netlist.v
+#   python gl_equiv.py --states 64 --seed 1   more register states, fixed seed
+#
+# Exits with 0 on PASS, 1 on a mismatch (FAIL) and 2 if the netlist cannot be
+# checked (ERROR: unknown cell, undriven net, unmappable flop, ...).
+#
+# Only the combinational cones of the checked outputs are evaluated. This is a
+# functional check, timing is still covered by `make GATES=yes` only.
+
+import argparse
+import random
+import re
+import sys
+import time
+
+
+# Functional models: cell name without "sg13g2_" and drive strength ->
+# (output pin, expression). Expressions are Python over bit planes, M is the
+# all-ones lane mask so "M ^ x" is the complement of x.
+CELLS = {
+    "inv": ("Y", "M ^ A"),
+    "buf": ("X", "A"),
+    "dlygate4sd1": ("X", "A"),
+    "dlygate4sd2": ("X", "A"),
+    "dlygate4sd3": ("X", "A"),
+    "and2": ("X", "A & B"),
+    "and3": ("X", "A & B & C"),
+    "and4": ("X", "A & B & C & D"),
+    "nand2": ("Y", "M ^ (A & B)"),
+    "nand2b": ("Y", "M ^ ((M ^ A_N) & B)"),
+    "nand3": ("Y", "M ^ (A & B & C)"),
+    "nand3b": ("Y", "M ^ ((M ^ A_N) & B & C)"),
+    "nand4": ("Y", "M ^ (A & B & C & D)"),
+    "or2": ("X", "A | B"),
+    "or3": ("X", "A | B | C"),
+    "or4": ("X", "A | B | C | D"),
+    "nor2": ("Y", "M ^ (A | B)"),
+    "nor2b": ("Y", "M ^ (A | (M ^ B_N))"),
+    "nor3": ("Y", "M ^ (A | B | C)"),
+    "nor4": ("Y", "M ^ (A | B | C | D)"),
+    "xor2": ("X", "A ^ B"),
+    "xnor2": ("Y", "M ^ A ^ B"),
+    "a21o": ("X", "(A1 & A2) | B1"),
+    "a21oi": ("Y", "M ^ ((A1 & A2) | B1)"),
+    "a22oi": ("Y", "M ^ ((A1 & A2) | (B1 & B2))"),
+    "a221oi": ("Y", "M ^ ((A1 & A2) | (B1 & B2) | C1)"),
+    "o21ai": ("Y", "M ^ ((A1 | A2) & B1)"),
+    "mux2": ("X", "(S & A1) | ((M ^ S) & A0)"),
+    "mux4": ("X", "(S1 & ((S0 & A3) | ((M ^ S0) & A2))) | ((M ^ S1) & ((S0 & A1) | ((M ^ S0) & A0)))"),
+    "tiehi": ("L_HI", "M"),
+    "tielo": ("L_LO", "0"),
+}
+
+# Flip-flops with asynchronous reset: the state is Q, the next state is D
+FLOPS = {"dfrbp", "dfrbpq"}
+
+# Physical-only cells without a logic function
+PHYSICAL = re.compile(r"fill|decap|antenna|tapcell|sighold")
+
+# Q net (or instance) name of a register file flop -> register index, bit
+STATE_NAME = re.compile(r"registers\[(\d+)\]\s*\[(\d+)\]")
+
+TOKEN = re.compile(
+    r"\\\S+"                                   # escaped identifier
+    r"|\d*'[sS]?[bBoOdDhH][0-9a-fA-FxXzZ_?]+"  # sized constant
+    r"|[A-Za-z_][A-Za-z0-9_$]*"                # identifier
+    r"|\d+"                                    # number
+    r"|[()\[\]{}.,:;=#]"                       # punctuation
+)
+
+ZERO, ONE = "1'b0", "1'b1"
+LANES = 1 << 16
+
+
+class NetlistError(Exception):
+    pass
+
+
+def _cell_model(cell):
+    name = re.sub(r"^sg13g2_", "", cell)
+    base = re.sub(r"_\d+$", "", name)
+    return name, base
+
+
+class Netlist:
+    """Flattened gate level netlist: every net bit has at most one driver."""
+
+    def __init__(self, text, top=None):
+        self.widths = {}
+        self.ports = {}
+        self.drivers = {}     # net bit -> (cell base, {pin: net bit}) or ("assign", source)
+        self.flops = {}       # Q net bit -> (instance, D net bit)
+        self.cells = {}
+        self._parse(text, top)
+
+    # Parsing
+
+    def _parse(self, text, top):
+        text = re.sub(r"/\*.*?\*/|\(\*.*?\*\)", " ", text, flags=re.S)
+        text = re.sub(r"//[^\n]*|^\s*`[^\n]*", " ", text, flags=re.M)
+        tokens = TOKEN.findall(text)
+
+        modules = {}
+        i = 0
+        while i < len(tokens):
+            if tokens[i] == "module":
+                end = tokens.index("endmodule", i)
+                modules[tokens[i + 1]] = tokens[i + 2:end]
+                i = end
+            i += 1
+        if not modules:
+            raise NetlistError("no module found in netlist")
+        if top is None:
+            candidates = [name for name in modules if name.startswith("tt_um_")] or list(modules)
+            top = candidates[0]
+        if top not in modules:
+            raise NetlistError(f"module {top} not found in netlist")
+
+        body = modules[top]
+        # Skip the port list, declarations follow in the body
+        start = body.index(";") + 1
+        statement = []
+        for token in body[start:]:
+            if token == ";":
+                self._statement(statement)
+                statement = []
+            else:
+                statement.append(token)
+
+    def _statement(self, tokens):
+        if not tokens:
+            return
+        keyword = tokens[0]
+        if keyword in ("input", "output", "inout", "wire", "reg", "tri", "supply0", "supply1"):
+            rest = tokens[1:]
+            if rest and rest[0] in ("wire", "reg"):
+                rest = rest[1:]
+            width = None
+            if rest and rest[0] == "[":
+                width = (int(rest[1]), int(rest[3]))
+                rest = rest[5:]
+            for name in (token for token in rest if token != ","):
+                self.widths[name] = width
+                if keyword in ("input", "output", "inout"):
+                    self.ports[name] = keyword
+        elif keyword == "assign":
+            split = tokens.index("=")
+            lhs = self._bits(tokens[1:split])
+            rhs = self._bits(tokens[split + 1:])
+            rhs = ([ZERO] * len(lhs) + rhs)[-len(lhs):]
+            for target, source in zip(lhs, rhs):
+                self._drive(target, ("assign", source))
+        else:
+            self._instance(tokens)
+
+    def _instance(self, tokens):
+        cell, name = tokens[0], tokens[1]
+        if tokens[2] != "(":
+            raise NetlistError(f"unsupported statement near {cell} {name}")
+        pins = {}
+        i = 3
+        while i < len(tokens) and tokens[i] == ".":
+            pin = tokens[i + 1]
+            depth = 0
+            j = i + 2
+            while True:
+                if tokens[j] == "(":
+                    depth += 1
+                elif tokens[j] == ")":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                j += 1
+            bits = self._bits(tokens[i + 3:j])
+            if bits:
+                pins[pin] = bits[-1]
+            i = j + 1
+            if tokens[i] == ",":
+                i += 1
+
+        model, base = _cell_model(cell)
+        self.cells[base] = self.cells.get(base, 0) + 1
+        if base in FLOPS:
+            # The state is kept as the Q net, its name maps the flop to a register file bit
+            q = pins.get("Q")
+            if q is None:
+                raise NetlistError(f"flop {name} has no Q connection, cannot map it to a register file bit")
+            self.flops[q] = (name, pins.get("D", ZERO))
+            self._drive(q, ("state", q))
+            if "Q_N" in pins:
+                self._drive(pins["Q_N"], ("inv", {"A": q}))
+        elif base in CELLS:
+            output, _ = CELLS[base]
+            if output in pins:
+                self._drive(pins[output], (base, pins))
+        elif not PHYSICAL.search(model):
+            raise NetlistError(f"no functional model for cell {cell} ({name})")
+
+    def _drive(self, net, driver):
+        if net in (ZERO, ONE):
+            return
+        if net in self.drivers:
+            raise NetlistError(f"net {net} has multiple drivers")
+        self.drivers[net] = driver
+
+    def _bits(self, tokens):
+        # Expression tokens -> list of net bits, MSB first
+        if not tokens:
+            return []
+        if tokens[0] == "{":
+            bits = []
+            part = []
+            depth = 0
+            for token in tokens[1:-1]:
+                if token == "," and depth == 0:
+                    bits.extend(self._bits(part))
+                    part = []
+                    continue
+                depth += token == "{"
+                depth -= token == "}"
+                part.append(token)
+            return bits + self._bits(part)
+        token = tokens[0]
+        if "'" in token:
+            size, value = token.split("'")
+            value = value.lstrip("sS")
+            radix = {"b": 2, "o": 8, "d": 10, "h": 16}[value[0].lower()]
+            number = int(re.sub(r"[xXzZ?]", "0", value[1:].replace("_", "")), radix)
+            size = int(size) if size else 32
+            return [ONE if number >> bit & 1 else ZERO for bit in reversed(range(size))]
+        if token.isdigit():
+            return [ONE if int(token) >> bit & 1 else ZERO for bit in reversed(range(32))]
+        if len(tokens) > 1 and tokens[1] == "[":
+            if tokens[3] == ":":
+                msb, lsb = int(tokens[2]), int(tokens[4])
+                step = -1 if msb >= lsb else 1
+                return [f"{token}[{bit}]" for bit in range(msb, lsb + step, step)]
+            return [f"{token}[{tokens[2]}]"]
+        width = self.widths.get(token)
+        if width is None:
+            return [token]
+        msb, lsb = width
+        step = -1 if msb >= lsb else 1
+        return [f"{token}[{bit}]" for bit in range(msb, lsb + step, step)]
+
+    # Evaluation
+
+    def _sources(self, net):
+        driver = self.drivers[net]
+        if driver[0] == "assign":
+            return [driver[1]]
+        pins = driver[1]
+        sources = []
+        for pin in re.findall(r"\b[A-Z][A-Z0-9_]*\b", CELLS[driver[0]][1]):
+            if pin == "M":
+                continue
+            if pin not in pins:
+                raise NetlistError(f"input {pin} of the cell driving {net} is not connected")
+            sources.append(pins[pin])
+        return sources
+
+    def state_bits(self):
+        # Register file flops: Q net -> (register index, bit)
+        mapping = {}
+        for q, (instance, _) in self.flops.items():
+            match = STATE_NAME.search(q) or STATE_NAME.search(instance)
+            if match is None:
+                raise NetlistError(f"cannot map flop {instance} (Q = {q}) to a register file bit")
+            mapping[q] = (int(match.group(1)), int(match.group(2)))
+        return mapping
+
+    def compile(self, inputs, outputs):
+        """Return (function, levels): function(input planes, M) -> output planes.
+
+        Only the cones of the requested outputs are evaluated, in level order.
+        """
+        order = []
+        level = {}
+        for net in inputs:
+            level[net] = 0
+        level[ZERO] = level[ONE] = 0
+
+        # Iterative depth-first walk from the outputs, a net is emitted after its sources
+        active = set()
+        for root in outputs:
+            stack = [(root, False)]
+            while stack:
+                net, expanded = stack.pop()
+                if expanded:
+                    active.discard(net)
+                    level[net] = 1 + max((level[source] for source in self._sources(net)), default=0)
+                    order.append(net)
+                    continue
+                if net in level:
+                    continue
+                if net in active:
+                    raise NetlistError(f"combinational loop through {net}")
+                driver = self.drivers.get(net)
+                if driver is None:
+                    raise NetlistError(f"net {net} has no driver")
+                if driver[0] == "state":
+                    raise NetlistError(f"flop output {net} is not an input of the evaluation")
+                active.add(net)
+                stack.append((net, True))
+                stack.extend((source, False) for source in self._sources(net) if source not in level)
+
+        names = {ZERO: "0", ONE: "M"}
+        lines = ["def evaluate(v, M):"]
+        for index, net in enumerate(inputs):
+            names[net] = f"n{index}"
+            lines.append(f"    n{index} = v[{index}]")
+        for net in order:
+            names[net] = f"n{len(names)}"
+            driver = self.drivers[net]
+            if driver[0] == "assign":
+                expression = names[driver[1]]
+            else:
+                pins = driver[1]
+                expression = re.sub(
+                    r"\b([A-Z][A-Z0-9_]*)\b",
+                    lambda match: "M" if match.group(1) == "M" else names[pins[match.group(1)]],
+                    CELLS[driver[0]][1],
+                )
+            lines.append(f"    {names[net]} = {expression}")
+        lines.append(f"    return ({', '.join(names[net] for net in outputs)},)")
+
+        namespace = {}
+        exec("\n".join(lines), namespace)
+        return namespace["evaluate"], max(level.values(), default=0)
+
+
+# Reference model, same semantics as the instruction set in docs/info.md
+
+def alu(control, a, b):
+    shift = b & 0b111
+    signed_a = a - 256 if a & 0x80 else a
+    signed_b = b - 256 if b & 0x80 else b
+    if control == 0b0000:
+        return a & b
+    if control == 0b0001:
+        return a | b
+    if control == 0b0010:
+        return (a + b) & 0xFF
+    if control == 0b0011:
+        return (a - b) & 0xFF
+    if control == 0b1001:
+        return a ^ b
+    if control == 0b0100:
+        return (a << shift) & 0xFF
+    if control == 0b0101:
+        return a >> shift
+    if control == 0b0110:
+        return (signed_a >> shift) & 0xFF
+    if control == 0b0111:
+        return int(signed_a < signed_b)
+    return 0
+
+
+def reference(instruction, registers):
+    # Returns (uo_out, register index written or None, value written)
+    opcode = instruction & 0b11
+    rd = (instruction >> 2) & 0b111
+    rs1 = (instruction >> 5) & 0b111
+    rs2 = (instruction >> 8) & 0b111
+    funct2 = (instruction >> 11) & 0b11
+    funct3 = (instruction >> 13) & 0b111
+    imm = (instruction >> 8) & 0x1F
+
+    a = registers[rs1]
+    control = funct3 | (0 if opcode == 0b01 else (funct2 & 1) << 3)
+
+    if opcode == 0b11:
+        result = alu(control, a, registers[rs2])
+        if funct3 == 0b000:
+            return a, None, 0
+        if funct3 == 0b011:
+            return int((result == 0) != bool(funct2 & 0b10)), None, 0
+        if funct3 == 0b111 and not funct2 & 0b10:
+            return result, None, 0
+        return 0, None, 0
+
+    if opcode == 0b10:
+        value = imm | funct3 << 5
+    elif opcode == 0b01:
+        value = alu(control, a, imm)
+    else:
+        value = alu(control, a, registers[rs2])
+    return 0, (rd if rd else None), value
+
+
+# Bit planes: bit j of a plane is the value of that signal in lane j
+
+def _counter_plane(bit, lanes):
+    # Plane of bit `bit` of the lane index
+    run = 1 << bit
+    plane = ((1 << run) - 1) << run
+    width = 2 * run
+    while width < lanes:
+        plane |= plane << width
+        width *= 2
+    return plane & ((1 << lanes) - 1)
+
+
+_BIT_TABLES = [bytes(ord("1") if value >> bit & 1 else ord("0") for value in range(256)) for bit in range(8)]
+
+
+def _byte_planes(values):
+    # bytes with one value per lane -> 8 planes, LSB first
+    return [int(values.translate(table)[::-1], 2) for table in _BIT_TABLES]
+
+
+def check(netlist, states=16, seed=None, max_failures=10):
+    rng = random.Random(seed)
+    mask = (1 << LANES) - 1
+    state = netlist.state_bits()
+
+    instruction = [f"ui_in[{bit}]" for bit in range(8)] + [f"uio_in[{bit}]" for bit in range(8)]
+    control = [net for net in ("rst_n", "ena", "clk") if net in netlist.widths]
+    inputs = instruction + control + list(state)
+    outputs = (
+        [f"uo_out[{bit}]" for bit in range(8)]
+        + [f"uio_out[{bit}]" for bit in range(8)]
+        + [f"uio_oe[{bit}]" for bit in range(8)]
+    )
+    next_state = [netlist.flops[q][1] for q in state]
+    evaluate, levels = netlist.compile(inputs, outputs + next_state)
+
+    instruction_planes = [_counter_plane(bit, LANES) for bit in range(16)]
+    control_planes = [0 if net == "clk" else mask for net in control]
+
+    failures = []
+    for _ in range(states):
+        # Random register file per lane; x0 is constant zero
+        registers = [bytes(LANES)] + [rng.randbytes(LANES) for _ in range(7)]
+        register_planes = [_byte_planes(values) for values in registers]
+
+        uo_out = bytearray(LANES)
+        written = [bytearray(values) for values in registers]
+        for lane in range(LANES):
+            result, rd, value = reference(lane, [values[lane] for values in registers])
+            uo_out[lane] = result
+            if rd is not None:
+                written[rd][lane] = value
+
+        expected = _byte_planes(bytes(uo_out)) + [0] * 16
+        expected += [_byte_planes(bytes(written[index]))[bit] for index, bit in state.values()]
+
+        state_planes = [register_planes[index][bit] for index, bit in state.values()]
+        actual = evaluate(instruction_planes + control_planes + state_planes, mask)
+
+        for net, want, got in zip(outputs + [f"next {q}" for q in state], expected, actual):
+            diff = want ^ got
+            if diff:
+                lane = (diff & -diff).bit_length() - 1
+                failures.append((net, lane, [values[lane] for values in registers], want >> lane & 1))
+                if len(failures) >= max_failures:
+                    return failures, levels
+    return failures, levels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the gate level netlist against the reference model")
+    parser.add_argument("netlist", nargs="?", default="gate_level_netlist.v")
+    parser.add_argument("--top", help="top module (default: the tt_um_ module)")
+    parser.add_argument("--states", type=int, default=16, help="random register states per instruction")
+    parser.add_argument("--seed", type=int, help="random seed")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        with open(args.netlist) as f:
+            netlist = Netlist(f.read(), args.top)
+        cells = ", ".join(f"{name} {count}" for name, count in sorted(netlist.cells.items()))
+        print(f"Parsed {args.netlist}: {sum(netlist.cells.values())} cells ({cells})")
+
+        failures, levels = check(netlist, args.states, args.seed)
+    except (NetlistError, OSError) as error:
+        # Exit code 2: the netlist could not be checked, 1: it does not match the reference model
+        print(f"ERROR: {error}")
+        return 2
+    vectors = args.states * LANES
+    print(f"{levels} logic levels, {vectors} vectors in {time.perf_counter() - start:.1f} s")
+
+    if not failures:
+        print("PASS: netlist matches the reference model")
+        return 0
+    for net, lane, registers, want in failures:
+        state = " ".join(f"x{index}={value}" for index, value in enumerate(registers))
+        print(f"FAIL: {net} expected {want} for instruction {lane:016b} with {state}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -35,4 +35,18 @@ module tb ();
       .rst_n  (rst_n)     // not reset
   );
 
+`ifdef LOCKSTEP
+`ifndef GL_TEST
+  // Register file packed into one bus for the lockstep checker (tb_lockstep.py),
+  // so it costs a single GPI read per cycle. x0 is in the lowest byte.
+  // RTL only: the flop net names of the gate level netlist are resolved in Python.
+  wire [63:0] lockstep_regs = {
+      user_project.reg_file.registers[7], user_project.reg_file.registers[6],
+      user_project.reg_file.registers[5], user_project.reg_file.registers[4],
+      user_project.reg_file.registers[3], user_project.reg_file.registers[2],
+      user_project.reg_file.registers[1], user_project.reg_file.registers[0]
+  };
+`endif
+`endif
+
 endmodule
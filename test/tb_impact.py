@@ -0,0 +1,328 @@
+# Change-impact test selection
+#
+# A full run records, per test phase, which RTL modules and mux branches the
+# phase exercised (its footprint). It samples the decoded instruction and the
+# ALU control signal inside the DUT after every instruction, so it needs the
+# RTL simulation; in GL simulation recording is skipped.
+#
+# Run from the test directory:
+#
+#   python tb_impact.py                 run only the phases affected by edits to src/
+#   python tb_impact.py --base HEAD~1   select against a git revision instead of the last full run
+#   python tb_impact.py --full          force a full run (and re-record the footprint)
+#   python tb_impact.py --dry-run       only print the selection
+#
+# Extra arguments are passed on to make, e.g. `python tb_impact.py GATES=yes`.
+# Every TB_IMPACT_FULL_EVERY selective runs (default 10) a full run is done as a
+# safety net. Changes to the testbench, to unknown Verilog files or to lines
+# that cannot be attributed to a branch also fall back to a full run.
+#
+# The testbench itself honours two environment variables, also usable directly
+# with make:
+#
+#   TB_PHASES=AND,SRA            run only these phases ("Test " prefix optional)
+#   TB_FOOTPRINT=footprint.json  record the footprint of this run into the file
+
+import argparse
+import difflib
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+
+TEST_DIR = Path(__file__).resolve().parent
+REPO_DIR = TEST_DIR.parent
+FOOTPRINT_FILE = TEST_DIR / "footprint.json"
+
+# Files whose content is snapshotted by a full run
+RTL_FILES = ("src/alu.v", "src/register.v", "src/project.v")
+# The testbench and the modules it imports; tb_impact.py itself records the footprint
+TESTBENCH_FILES = (
+    "test/test.py",
+    "test/tb.v",
+    "test/Makefile",
+    "test/tb_impact.py",
+    "test/tb_lockstep.py",
+    "test/tb_profiler.py",
+)
+
+# ALU control values, see localparam in alu.v
+ALU_OPS = {
+    0b0000: "AND",
+    0b0001: "OR",
+    0b0010: "ADD",
+    0b0011: "SUB",
+    0b1001: "XOR",
+    0b0100: "SLL",
+    0b0101: "SRL",
+    0b0110: "SRA",
+    0b0111: "SLT",
+}
+
+# Changed line (comments stripped, whitespace collapsed) -> footprint items it affects.
+# "{op}" is replaced by the "op" group of the match, "<module>:*" means any branch of
+# the module and "*" every phase. Lines matching no rule use the file's fallback.
+CHANGE_RULES = {
+    "src/alu.v": (
+        [
+            (r"(assign out = )?\(control == (?P<op>\w+)\) \? .*", "alu:{op}"),
+            (r"(?P<op>AND|OR|ADD|SUB|XOR|SLL|SRL|SRA|SLT) = 4'b\d{4}[,;]", "alu:{op}"),
+            (r"(wire \[`WIDTH:0\] |assign )sum\b.*", "alu:ADD"),
+            (r"(wire \[`WIDTH:0\] |assign )dif\b.*", "alu:SUB"),
+            (r"(wire \[`WIDTH-1:0\] |assign )(right_shifted|sign_extend)\b.*", "alu:SRA"),
+            (r"(wire \[\$clog2\(`WIDTH\)-1:0\] |assign )shift\b.*", "alu:SLL alu:SRL alu:SRA"),
+            (r"assign carry = .*", "alu:carry"),
+            (r"assign zero = .*", "alu:zero"),
+            (r"\{`WIDTH\{1'b0\}\};", "alu:default"),
+        ],
+        "alu:*",
+    ),
+    "src/register.v": (
+        [
+            (r"assign read_data[12] = registers\[read_reg[12]\];", "register:read"),
+            (r"end else if \(we && write_reg != 3'b000\) begin", "register:write register:x0"),
+            (r"registers\[write_reg\] <= write_data;", "register:write"),
+        ],
+        "register:*",
+    ),
+    "src/project.v": (
+        [
+            # Decode lines (is_i_type, is_l_type, imm) feed the ALU operand and write data
+            # muxes of every instruction, so they use the fallback and select every phase
+            (r"(assign result = )?\(opcode == 2'b11 && funct3 == 3'b000\) \? reg_data1 :", "project:result:store"),
+            (r"\(opcode == 2'b11 && funct3 == 3'b011 && funct2\[1\] == 1'b0\) \? .* :", "project:result:beq"),
+            (r"\(opcode == 2'b11 && funct3 == 3'b011 && funct2\[1\] == 1'b1\) \? .* :", "project:result:bne"),
+            (r"\(opcode == 2'b11 && funct3 == 3'b111 && funct2\[1\] == 1'b0\) \? .* :", "project:result:blt"),
+            (r"8'b00000000;", "project:result:zero"),
+        ],
+        "*",
+    ),
+}
+
+
+def phase_key(name):
+    # "Test AND" and "and" select the same phase
+    name = name.strip().lower()
+    return name[5:] if name.startswith("test ") else name
+
+
+class ImpactRecorder:
+    """Phase selection and footprint recording inside the cocotb test."""
+
+    def __init__(self):
+        phases = os.environ.get("TB_PHASES", "").strip()
+        self.phases = {phase_key(name) for name in phases.split(",") if name.strip()} if phases else None
+        self.path = os.environ.get("TB_FOOTPRINT") or None
+        self.footprint = {}
+        self._current = None
+        self._top = None
+
+    def selected(self, name):
+        return self.phases is None or phase_key(name) in self.phases
+
+    def phase(self, name):
+        if self.path:
+            self._current = self.footprint.setdefault(name, set())
+
+    def sample(self, dut):
+        # Record the branches exercised by the instruction currently applied to the DUT
+        if self._current is None:
+            return
+        if self._top is None:
+            try:
+                top = dut.user_project
+                self._top = (top.instruction, top.alu_control)
+            except AttributeError:
+                dut._log.warning("Internal signals not found (GL simulation?), footprint not recorded")
+                self.path = None
+                self._current = None
+                return
+        instruction = int(self._top[0].value)
+        alu_control = int(self._top[1].value)
+
+        opcode = instruction & 0b11
+        rd = (instruction >> 2) & 0b111
+        funct2 = (instruction >> 11) & 0b11
+        funct3 = (instruction >> 13) & 0b111
+
+        items = self._current
+        items.update(("project:decode", "register:read"))
+        items.add(("project:r_type", "project:i_type", "project:l_type", "project:s_type")[opcode])
+        alu = f"alu:{ALU_OPS.get(alu_control, 'default')}"
+
+        if opcode != 0b11:
+            items.add("register:write" if rd else "register:x0")
+            if opcode != 0b10:
+                items.add(alu)
+            items.add("project:result:zero")
+        elif funct3 == 0b000:
+            items.add("project:result:store")
+        elif funct3 == 0b011:
+            items.update((alu, "alu:zero", "project:result:bne" if funct2 & 0b10 else "project:result:beq"))
+        elif funct3 == 0b111 and not funct2 & 0b10:
+            items.update((alu, "project:result:blt"))
+        else:
+            items.add("project:result:zero")
+
+    def save(self):
+        if not self.path:
+            return
+        with open(self.path, "w") as f:
+            json.dump({name: sorted(items) for name, items in self.footprint.items()}, f, indent=2)
+
+
+impact = ImpactRecorder()
+
+
+# Selection
+
+def _normalize(line):
+    line = line.split("//")[0].strip()
+    if line.startswith(("/*", "*")):
+        return ""
+    return " ".join(line.split())
+
+
+def changed_items(changes):
+    # changes: {path: [changed line, ...]} -> footprint items, or None if a full run is needed
+    items = set()
+    for path, lines in changes.items():
+        if path in TESTBENCH_FILES:
+            return None
+        if path not in CHANGE_RULES:
+            if path.endswith(".v"):
+                return None
+            continue
+        rules, fallback = CHANGE_RULES[path]
+        for line in lines:
+            line = _normalize(line)
+            if not line:
+                continue
+            matched = False
+            for pattern, targets in rules:
+                match = re.fullmatch(pattern, line)
+                if match:
+                    items.update(targets.format(**match.groupdict()).split())
+                    matched = True
+            if not matched:
+                items.add(fallback)
+    return items
+
+
+def select_phases(footprint, items):
+    selected = []
+    for name, phase_items in footprint.items():
+        for item in items:
+            if item == "*" or (item.endswith(":*") and any(i.startswith(item[:-1]) for i in phase_items)):
+                break
+            if item in phase_items:
+                break
+        else:
+            continue
+        selected.append(name)
+    return selected
+
+
+def snapshot():
+    return {path: (REPO_DIR / path).read_text() for path in RTL_FILES + TESTBENCH_FILES if (REPO_DIR / path).exists()}
+
+
+def snapshot_changes(previous):
+    changes = {}
+    current = snapshot()
+    for path in sorted(set(previous) | set(current)):
+        old = previous.get(path, "").splitlines()
+        new = current.get(path, "").splitlines()
+        lines = []
+        for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes():
+            if tag != "equal":
+                lines.extend(old[i1:i2] + new[j1:j2])
+        if lines:
+            changes[path] = lines
+    return changes
+
+
+def git_changes(base):
+    diff = subprocess.run(
+        ["git", "diff", "-U0", base, "--", "src", *TESTBENCH_FILES],
+        cwd=REPO_DIR, check=True, capture_output=True, text=True,
+    ).stdout
+    changes = {}
+    path = None
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            path = line.split(" b/", 1)[1]
+            changes.setdefault(path, [])
+        elif line.startswith(("+++", "---", "@@")):
+            continue
+        elif line.startswith(("+", "-")) and path is not None:
+            changes[path].append(line[1:])
+    return changes
+
+
+def run_make(make_args, phases=None, record=None):
+    env = dict(os.environ)
+    env.pop("TB_PHASES", None)
+    env.pop("TB_FOOTPRINT", None)
+    if phases is not None:
+        env["TB_PHASES"] = ",".join(phase_key(name) for name in phases)
+    if record is not None:
+        env["TB_FOOTPRINT"] = str(record)
+    subprocess.run(["make", "-B", *make_args], cwd=TEST_DIR, env=env, check=True)
+    # make returns success even if the test fails, so check the results.xml
+    return "<failure" not in (TEST_DIR / "results.xml").read_text()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run only the test phases affected by RTL changes")
+    parser.add_argument("--base", help="git revision to diff src/ against (default: state of the last full run)")
+    parser.add_argument("--full", action="store_true", help="force a full run and re-record the footprint")
+    parser.add_argument("--dry-run", action="store_true", help="print the selected phases without running")
+    parser.add_argument("make_args", nargs="*", help="extra arguments for make, e.g. GATES=yes")
+    args = parser.parse_args(argv)
+
+    full_every = int(os.environ.get("TB_IMPACT_FULL_EVERY", "10"))
+    state = json.loads(FOOTPRINT_FILE.read_text()) if FOOTPRINT_FILE.exists() else None
+
+    reason = None
+    if args.full:
+        reason = "requested"
+    elif state is None:
+        reason = "no footprint recorded yet"
+    elif state["runs_since_full"] + 1 >= full_every:
+        reason = f"periodic full run (every {full_every} runs)"
+    else:
+        changes = git_changes(args.base) if args.base else snapshot_changes(state["snapshot"])
+        items = changed_items(changes)
+        if items is None:
+            reason = "testbench or unknown source changed"
+
+    if reason is not None:
+        print(f"Full run: {reason}")
+        if args.dry_run:
+            return 0
+        record = TEST_DIR / "footprint.phases.json"
+        passed = run_make(args.make_args, record=record)
+        if passed and record.exists():
+            phases = json.loads(record.read_text())
+            FOOTPRINT_FILE.write_text(json.dumps({"runs_since_full": 0, "phases": phases, "snapshot": snapshot()}, indent=2))
+        if record.exists():
+            record.unlink()
+        return 0 if passed else 1
+
+    selected = select_phases(state["phases"], items)
+    print(f"Changed: {', '.join(sorted(items)) or 'nothing'}")
+    print(f"Selected phases: {', '.join(selected) or 'none'}")
+    if args.dry_run or not selected:
+        return 0
+    passed = run_make(args.make_args, phases=selected)
+    state["runs_since_full"] += 1
+    FOOTPRINT_FILE.write_text(json.dumps(state, indent=2))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+# Testbench profiling and instrumentation hooks
+#
+# Enable with the TB_PROFILE environment variable, no code changes needed:
+#
+#   make -B TB_PROFILE=1          wall/sim time, cycles and GPI counts per phase and helper
+#   make -B TB_PROFILE=cprofile   same, plus a cProfile dump of the Python side
+#   make -B TB_PROFILE=sample     same, plus a statistical stack sampler
+#
+# TB_PROFILE_OUT sets the output basename (default "profile"), which produces
+# <basename>.json, <basename>.collapsed (flamegraph.pl / speedscope input) and
+# <basename>.prof in cprofile mode. TB_PROFILE_INTERVAL sets the sampler period
+# in milliseconds (default 1).
+#
+# Wall time of every record is split into:
+#   sim     time spent inside the simulator between Python callbacks (iverilog)
+#   gpi     time spent reading / writing signal values through GPI handles (writes
+#           of the Clock task are reported as their own "clock" entry)
+#   log     time spent emitting log records
+#   python  everything else (golden model, instruction encoding, cocotb scheduler)
+
+import cProfile
+import functools
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+
+import cocotb
+from cocotb.handle import ModifiableObject
+from cocotb.utils import get_sim_time
+
+
+PROFILE_MODES = ("timing", "cprofile", "sample")
+
+
+def _mode_from_env():
+    value = os.environ.get("TB_PROFILE", "").strip().lower()
+    if value in ("", "0", "no", "off", "false"):
+        return None
+    if value in ("1", "yes", "on", "true"):
+        return "timing"
+    if value not in PROFILE_MODES:
+        raise ValueError(f"TB_PROFILE must be one of {', '.join(PROFILE_MODES)}, got {value!r}")
+    return value
+
+
+class _Record:
+    # Accumulated cost of one (phase, helper) pair
+    __slots__ = ("calls", "wall_s", "sim_wait_s", "gpi_s", "log_s", "other_s", "sim_ns", "gpi_reads", "gpi_writes")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_s = 0.0
+        self.sim_wait_s = 0.0
+        self.gpi_s = 0.0
+        self.log_s = 0.0
+        self.other_s = 0.0  # spent while this record was active, but charged to another one
+        self.sim_ns = 0.0
+        self.gpi_reads = 0
+        self.gpi_writes = 0
+
+    def add(self, other):
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def python_s(self):
+        return max(0.0, self.wall_s - self.sim_wait_s - self.gpi_s - self.log_s - self.other_s)
+
+    def as_dict(self, clock_period_ns):
+        return {
+            "calls": self.calls,
+            "wall_s": round(self.wall_s, 6),
+            "sim_s": round(self.sim_wait_s, 6),
+            "gpi_s": round(self.gpi_s, 6),
+            "log_s": round(self.log_s, 6),
+            "python_s": round(self.python_s(), 6),
+            "sim_time_ns": self.sim_ns,
+            "cycles": int(round(self.sim_ns / clock_period_ns)) if clock_period_ns else None,
+            "gpi_reads": self.gpi_reads,
+            "gpi_writes": self.gpi_writes,
+        }
+
+
+class Profiler:
+    """Attribute testbench cost to test phases and helper call types.
+
+    When profiling is disabled every hook is a no-op and the decorators return
+    the decorated function unchanged, so the regular run pays nothing.
+    """
+
+    def __init__(self, mode=None):
+        self.mode = mode
+        self.enabled = mode is not None
+        self.out = os.environ.get("TB_PROFILE_OUT", "profile")
+        self.interval = float(os.environ.get("TB_PROFILE_INTERVAL", "1")) / 1000
+        self._reset()
+
+    def _reset(self):
+        self._records = {}
+        self._phases = []
+        self._key = ("Setup", None)
+        self._mark = 0.0
+        self._sim_mark = 0.0
+        self._react_depth = 0
+        self._left_python = None
+        self._restore = []
+        self._cprofile = None
+        self._sampler = None
+        self._samples = {}
+        self._clock = None
+        self._clock_record = _Record()
+        self.clock_period_ns = None
+
+    # Public hooks used by the testbench
+
+    def profile(self, clock_period_ns, clock="clk"):
+        # Decorator for a cocotb test: profile the whole test, write the report even on failure.
+        # Writes to the `clock` signal by the Clock task are reported separately from the helpers.
+        def decorator(func):
+            if not self.enabled:
+                return func
+
+            @functools.wraps(func)
+            async def wrapper(dut, *args, **kwargs):
+                self.start(clock_period_ns, getattr(dut, clock, None))
+                try:
+                    return await func(dut, *args, **kwargs)
+                finally:
+                    self.stop()
+            return wrapper
+        return decorator
+
+    def helper(self, func):
+        # Decorator for an async helper: its cost is attributed to "<phase>;<helper name>"
+        if not self.enabled:
+            return func
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not self._restore:
+                return await func(*args, **kwargs)
+            previous = self._key
+            self._switch((previous[0], func.__name__))
+            self._record().calls += 1
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self._switch(previous)
+        return wrapper
+
+    def phase(self, name):
+        # Start a new test phase; everything up to the next phase() call is charged to it
+        if not self.enabled or not self._restore:
+            return
+        self._switch((name, None))
+
+    # Start / stop
+
+    def start(self, clock_period_ns, clock=None):
+        self._reset()
+        self.clock_period_ns = clock_period_ns
+        self._clock = clock
+        self._mark = time.perf_counter()
+        self._sim_mark = get_sim_time(units="ns")
+        self._phases.append(self._key[0])
+        self._install_hooks()
+
+        if self.mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        elif self.mode == "sample":
+            self._sampler = threading.Thread(
+                target=self._sample_loop, args=(threading.get_ident(),), name="tb-profiler", daemon=True
+            )
+            self._sampler.start()
+
+    def stop(self):
+        if not self._restore:
+            return
+        self._switch(self._key)
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        sampler, self._sampler = self._sampler, None
+        if sampler is not None:
+            sampler.join()
+
+        for target, name, original in reversed(self._restore):
+            if original is None:
+                delattr(target, name)
+            else:
+                setattr(target, name, original)
+        self._restore = []
+        self._write_reports()
+
+    # Accounting
+
+    def _record(self, key=None):
+        key = key or self._key
+        record = self._records.get(key)
+        if record is None:
+            record = self._records[key] = _Record()
+        return record
+
+    def _switch(self, key):
+        now = time.perf_counter()
+        sim_now = get_sim_time(units="ns")
+        record = self._record()
+        record.wall_s += now - self._mark
+        record.sim_ns += sim_now - self._sim_mark
+        self._mark = now
+        self._sim_mark = sim_now
+        if key[0] not in self._phases:
+            self._phases.append(key[0])
+        self._key = key
+
+    def _install_hooks(self):
+        profiler = self
+
+        # GPI signal reads: every read of a signal value goes through this property
+        value = ModifiableObject.value
+
+        def get_value(handle):
+            start = time.perf_counter()
+            try:
+                return value.fget(handle)
+            finally:
+                record = profiler._record()
+                record.gpi_s += time.perf_counter() - start
+                record.gpi_reads += 1
+
+        self._patch(ModifiableObject, "value", property(get_value, value.fset, None, value.__doc__))
+
+        # GPI signal writes: the setter only queues the write, the scheduler applies it later
+        # (in the ReadWrite phase). Time the queued call when it runs, and charge it to the record
+        # that issued it, or to the clock entry for the Clock task's writes.
+        scheduler = cocotb.scheduler
+        schedule_write = scheduler._schedule_write
+
+        def timed_schedule_write(handle, write_func, *args):
+            record = profiler._clock_record if handle is profiler._clock else profiler._record()
+
+            def timed_write(*write_args):
+                start = time.perf_counter()
+                try:
+                    return write_func(*write_args)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    record.gpi_s += elapsed
+                    record.gpi_writes += 1
+                    current = profiler._record()
+                    if current is not record:
+                        current.other_s += elapsed
+
+            return schedule_write(handle, timed_write, *args)
+
+        self._patch(scheduler, "_schedule_write", timed_schedule_write)
+
+        # Logging: time spent formatting and emitting records
+        handle = logging.Logger.handle
+
+        def timed_handle(logger, record):
+            start = time.perf_counter()
+            try:
+                return handle(logger, record)
+            finally:
+                profiler._record().log_s += time.perf_counter() - start
+
+        self._patch(logging.Logger, "handle", timed_handle)
+
+        # Simulator time: the gap between leaving a scheduler callback and the next one firing
+        for name in ("_sim_react", "_react"):
+            react = getattr(scheduler, name, None)
+            if react is not None:
+                break
+        else:
+            return
+
+        def timed_react(*args, **kwargs):
+            if profiler._react_depth == 0 and profiler._left_python is not None:
+                profiler._record().sim_wait_s += time.perf_counter() - profiler._left_python
+            profiler._react_depth += 1
+            try:
+                return react(*args, **kwargs)
+            finally:
+                profiler._react_depth -= 1
+                if profiler._react_depth == 0:
+                    profiler._left_python = time.perf_counter()
+
+        self._patch(scheduler, name, timed_react)
+        self._left_python = time.perf_counter()
+
+    def _patch(self, target, name, replacement):
+        # Attributes that were only inherited are deleted again on restore
+        original = vars(target).get(name)
+        self._restore.append((target, name, original))
+        setattr(target, name, replacement)
+
+    # Statistical sampler
+
+    def _sample_loop(self, thread_id):
+        while self._sampler is not None:
+            frame = sys._current_frames().get(thread_id)
+            stack = [self._key[0]]
+            if frame is None:
+                stack.append("[simulator]")
+            else:
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                    frame = frame.f_back
+                stack.extend(reversed(frames))
+            key = ";".join(stack)
+            self._samples[key] = self._samples.get(key, 0) + 1
+            time.sleep(self.interval)
+
+    # Reports
+
+    def _write_reports(self):
+        period = self.clock_period_ns
+        total = _Record()
+        helpers = {}
+        phases = []
+        for phase in self._phases:
+            phase_total = _Record()
+            phase_helpers = {}
+            for (name, helper), record in self._records.items():
+                if name != phase:
+                    continue
+                phase_total.add(record)
+                if helper is not None:
+                    phase_helpers[helper] = record.as_dict(period)
+                    helpers.setdefault(helper, _Record()).add(record)
+            total.add(phase_total)
+            entry = {"name": phase}
+            entry.update(phase_total.as_dict(period))
+            entry["calls"] = sum(helper["calls"] for helper in phase_helpers.values())
+            entry["helpers"] = phase_helpers
+            phases.append(entry)
+
+        report = {
+            "mode": self.mode,
+            "clock_period_ns": period,
+            "total": total.as_dict(period),
+            "phases": phases,
+            "helpers": {name: record.as_dict(period) for name, record in helpers.items()},
+            "clock": {
+                "gpi_writes": self._clock_record.gpi_writes,
+                "gpi_s": round(self._clock_record.gpi_s, 6),
+            },
+        }
+
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(f"{self.out}.prof")
+            stats = pstats.Stats(self._cprofile)
+            top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:25]
+            report["cprofile"] = [
+                {
+                    "function": f"{func} ({os.path.basename(path)}:{line})",
+                    "calls": calls,
+                    "tottime_s": round(tottime, 6),
+                    "cumtime_s": round(cumtime, 6),
+                }
+                for (path, line, func), (_, calls, tottime, cumtime, _) in top
+            ]
+
+        with open(f"{self.out}.json", "w") as f:
+            json.dump(report, f, indent=2)
+
+        with open(f"{self.out}.collapsed", "w") as f:
+            if self._samples:
+                for stack, count in sorted(self._samples.items()):
+                    f.write(f"{stack} {count}\n")
+            else:
+                # Deterministic mode: weights are microseconds of wall time
+                for (phase, helper), record in self._records.items():
+                    prefix = phase if helper is None else f"{phase};{helper}"
+                    for category, seconds in (
+                        ("sim", record.sim_wait_s),
+                        ("gpi", record.gpi_s),
+                        ("log", record.log_s),
+                        ("python", record.python_s()),
+                    ):
+                        weight = int(seconds * 1e6)
+                        if weight:
+                            f.write(f"{prefix};{category} {weight}\n")
+                weight = int(self._clock_record.gpi_s * 1e6)
+                if weight:
+                    f.write(f"Clock;gpi {weight}\n")
+
+        print(f"Profile written to {self.out}.json and {self.out}.collapsed\n")
+
+
+profiler = Profiler(_mode_from_env())
@@ -0,0 +1,146 @@
+# Tests for the netlist parser and evaluator of gl_equiv.py, run with `python -m pytest test_gl_equiv.py`
+
+import random
+
+import pytest
+
+from gl_equiv import Netlist, NetlistError, _byte_planes, _counter_plane, reference
+
+
+# Small netlist in the style of the OpenROAD output: escaped register file nets,
+# attributes, tie cells, a filler and assigns
+NETLIST = r"""
+module tt_um_example (ui_in,
+    uo_out,
+    clk,
+    rst_n);
+ input [7:0] ui_in;
+ output [7:0] uo_out;
+ input clk;
+ input rst_n;
+
+ wire _00_;
+ wire _01_;
+ wire net1;
+ wire net2;
+ wire [7:0] \reg_file.registers[1] ;
+
+ (* keep = 1 *)
+ sg13g2_mux4_1 _02_ (.A0(ui_in[0]),
+    .A1(ui_in[1]),
+    .A2(ui_in[2]),
+    .A3(ui_in[3]),
+    .S0(ui_in[4]),
+    .S1(ui_in[5]),
+    .X(uo_out[0]));
+ sg13g2_nand2b_1 _03_ (.A_N(ui_in[0]),
+    .B(ui_in[1]),
+    .Y(uo_out[1]));
+ sg13g2_nor2b_1 _04_ (.A(ui_in[0]),
+    .B_N(ui_in[1]),
+    .Y(uo_out[2]));
+ sg13g2_tiehi _05_ (.L_HI(net1));
+ sg13g2_tielo _06_ (.L_LO(net2));
+ sg13g2_xor2_1 _07_ (.A(ui_in[6]),
+    .B(\reg_file.registers[1] [0] ),
+    .X(_00_));
+ sg13g2_dfrbp_1 _08_ (.CLK(clk),
+    .D(_00_),
+    .RESET_B(rst_n),
+    .Q(\reg_file.registers[1] [0] ),
+    .Q_N(_01_));
+ sg13g2_fill_1 FILLER_0_0 ();
+ assign uo_out[3] = net1;
+ assign uo_out[4] = net2;
+ assign uo_out[5] = _01_;
+ assign uo_out[7:6] = 2'b10;
+endmodule
+"""
+
+Q = r"\reg_file.registers[1][0]"
+
+
+def bit(value, index):
+    return value >> index & 1
+
+
+def test_parse():
+    netlist = Netlist(NETLIST)
+    assert netlist.cells == {"mux4": 1, "nand2b": 1, "nor2b": 1, "tiehi": 1, "tielo": 1, "xor2": 1, "dfrbp": 1, "fill": 1}
+    assert netlist.flops == {Q: ("_08_", "_00_")}
+    assert netlist.state_bits() == {Q: (1, 0)}
+
+
+def test_compile_matches_truth_tables():
+    netlist = Netlist(NETLIST)
+    inputs = [f"ui_in[{index}]" for index in range(7)] + [Q]
+    outputs = [f"uo_out[{index}]" for index in range(8)] + ["_00_"]
+    evaluate, levels = netlist.compile(inputs, outputs)
+    assert levels == 2
+
+    # One lane per combination of the 8 inputs
+    lanes = 1 << len(inputs)
+    planes = evaluate([_counter_plane(index, lanes) for index in range(len(inputs))], (1 << lanes) - 1)
+
+    for lane in range(lanes):
+        a = [bit(lane, index) for index in range(7)]
+        q = bit(lane, 7)
+        expected = [
+            a[(a[5] << 1) | a[4]],      # mux4
+            1 - ((1 - a[0]) & a[1]),    # nand2b
+            1 - (a[0] | (1 - a[1])),    # nor2b
+            1,                          # tiehi
+            0,                          # tielo
+            1 - q,                      # Q_N
+            0, 1,                       # 2'b10
+            a[6] ^ q,                   # next state
+        ]
+        assert [bit(plane, lane) for plane in planes] == expected, f"lane {lane:08b}"
+
+
+def test_netlist_errors():
+    with pytest.raises(NetlistError, match="no functional model"):
+        Netlist(NETLIST.replace("sg13g2_xor2_1", "sg13g2_xor3_1"))
+    with pytest.raises(NetlistError, match="multiple drivers"):
+        Netlist(NETLIST.replace("assign uo_out[4] = net2;", "assign uo_out[3] = net2;"))
+    with pytest.raises(NetlistError, match="no Q connection"):
+        Netlist(NETLIST.replace(r".Q(\reg_file.registers[1] [0] ),", ""))
+    with pytest.raises(NetlistError, match="no driver"):
+        Netlist(NETLIST.replace(" sg13g2_tiehi _05_ (.L_HI(net1));", "")).compile([], ["uo_out[3]"])
+
+
+def test_counter_plane():
+    for index in range(6):
+        plane = _counter_plane(index, 64)
+        assert [bit(plane, lane) for lane in range(64)] == [bit(lane, index) for lane in range(64)]
+
+
+def test_byte_planes():
+    values = random.Random(1).randbytes(300)
+    planes = _byte_planes(values)
+    for index, plane in enumerate(planes):
+        assert [bit(plane, lane) for lane in range(len(values))] == [bit(value, index) for value in values]
+
+
+def encode(opcode, rd=0, rs1=0, rs2=0, funct2=0, funct3=0):
+    return opcode | rd << 2 | rs1 << 5 | rs2 << 8 | funct2 << 11 | funct3 << 13
+
+
+def test_reference():
+    registers = [0, 5, 3, 0x80, 0x7F, 0, 0, 0]
+    # R-type: ADD, SUB, SLT (signed)
+    assert reference(encode(0b00, rd=5, rs1=1, rs2=2, funct3=0b010), registers) == (0, 5, 8)
+    assert reference(encode(0b00, rd=5, rs1=2, rs2=1, funct3=0b011), registers) == (0, 5, 0xFE)
+    assert reference(encode(0b00, rd=5, rs1=3, rs2=4, funct3=0b111), registers) == (0, 5, 1)
+    # I-type ADDI, the 5-bit immediate is in the rs2 and funct2 fields
+    assert reference(encode(0b01, rd=6, rs1=1, rs2=0b111, funct2=0b11, funct3=0b010), registers) == (0, 6, 36)
+    # L-type: imm[7:5] from funct3
+    assert reference(encode(0b10, rd=7, rs2=0b001, funct3=0b101), registers) == (0, 7, 0b10100001)
+    # Writes to x0 are dropped
+    assert reference(encode(0b10, rd=0, rs2=1), registers) == (0, None, 1)
+    # S-type: store, BEQ, BNE, BLT and an unused encoding
+    assert reference(encode(0b11, rs1=4, funct3=0b000), registers) == (0x7F, None, 0)
+    assert reference(encode(0b11, rs1=1, rs2=1, funct3=0b011), registers) == (1, None, 0)
+    assert reference(encode(0b11, rs1=1, rs2=2, funct3=0b011, funct2=0b10), registers) == (1, None, 0)
+    assert reference(encode(0b11, rs1=3, rs2=4, funct3=0b111), registers) == (1, None, 0)
+    assert reference(encode(0b11, rs1=1, funct3=0b101), registers) == (0, None, 0)
@@ -0,0 +1,53 @@
+# Tests for the change-impact selection of tb_impact.py, run with `python -m pytest test_tb_impact.py`
+
+from tb_impact import changed_items, select_phases
+
+
+FOOTPRINT = {
+    "Test AND": ["alu:AND", "project:decode", "project:r_type", "project:result:zero", "register:read", "register:write"],
+    "Test ADDI": ["alu:ADD", "project:decode", "project:i_type", "project:result:zero", "register:read", "register:write"],
+    "Test BNE": ["alu:SUB", "alu:zero", "project:decode", "project:result:bne", "project:s_type", "register:read"],
+    "Test SRA": ["alu:SRA", "project:decode", "project:i_type", "project:result:zero", "register:read", "register:write"],
+}
+
+
+def select(path, *lines):
+    items = changed_items({path: list(lines)})
+    return None if items is None else select_phases(FOOTPRINT, items)
+
+
+def test_alu_op_selects_its_phase():
+    assert select("src/alu.v", "                    (control == SRA) ? (right_shifted | sign_extend) :") == ["Test SRA"]
+    assert select("src/alu.v", "    assign sign_extend = a[`WIDTH-1] ? 8'hFF : 8'h00;") == ["Test SRA"]
+
+
+def test_result_branch_selects_its_phase():
+    line = "                    (opcode == 2'b11 && funct3 == 3'b011 && funct2[1] == 1'b1) ? 8'b00000000 :"
+    assert select("src/project.v", line) == ["Test BNE"]
+
+
+def test_decode_lines_select_every_phase():
+    # is_i_type and is_l_type steer the ALU operand and write data of all instructions
+    for line in (
+        "    wire is_i_type = (opcode == 2'b01) || (opcode == 2'b00 && funct3 == 3'b000);",
+        "    wire is_l_type = (opcode == 2'b10);",
+        "    assign imm[7:5]    = is_l_type ? instruction[15:13] : 3'b1;",
+        "        .b(is_i_type ? imm[7:0] : reg_data2),",
+    ):
+        assert select("src/project.v", line) == list(FOOTPRINT)
+
+
+def test_unknown_line_uses_module_fallback():
+    assert select("src/alu.v", "    input  wire [3:0]        control,   // Control Signal") == list(FOOTPRINT)
+    assert select("src/register.v", "            registers[0] <= 0;") == ["Test AND", "Test ADDI", "Test BNE", "Test SRA"]
+
+
+def test_comments_select_nothing():
+    assert select("src/alu.v", "    // assign uo_out[5:0] = out[5:0];", "") == []
+
+
+def test_testbench_change_needs_full_run():
+    assert select("test/test.py", "async def phase_and(dut):") is None
+    assert select("test/tb_impact.py", "        items.add(alu)") is None
+    assert select("test/Makefile", "COMPILE_ARGS    += -DLOCKSTEP") is None
+    assert select("src/new_module.v", "module new_module();") is None